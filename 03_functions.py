@@ -5,6 +5,9 @@ Learn how to create and use functions in Python.
 Updated: Enhanced examples with better explanations.
 """
 
+import time
+import functools
+
 # ============================================
 # 1. BASIC FUNCTIONS
 # ============================================
@@ -140,25 +143,100 @@ print(f"Even numbers: {even_numbers}")
 print("\n=== Recursion ===\n")
 
 # Factorial using recursion
+# n * factorial(n - 1) needs n nested calls (Python stops at about 1000)
+# and multiplies a huge number by a small one at every step. Splitting the
+# range in half and multiplying the two halves ("binary splitting") only
+# recurses log2(n) levels deep, and Python multiplies two numbers of
+# similar size much faster:
+#     1*2*...*8 = ((1*2) * (3*4)) * ((5*6) * (7*8))
+def product_range(lo, hi):
+    """Multiply lo * (lo + 1) * ... * (hi - 1)."""
+    if hi - lo <= 16:
+        result = 1
+        for number in range(lo, hi):
+            result *= number
+        return result
+    middle = (lo + hi) // 2
+    return product_range(lo, middle) * product_range(middle, hi)
+
 def factorial(n):
-    if n == 0 or n == 1:
-        return 1
-    else:
-        return n * factorial(n - 1)
+    if n < 0:
+        raise ValueError("factorial is not defined for negative numbers")
+    return product_range(2, n + 1)
 
 print(f"Factorial of 5: {factorial(5)}")
+print(f"Factorial of 10,000 has {factorial(10_000).bit_length()} bits")
 
 # Fibonacci sequence
+# The obvious recursive version, fibonacci(n - 1) + fibonacci(n - 2),
+# computes the same values again and again: fibonacci(40) makes over
+# 300 million calls. Two better ways:
+#
+# 1. To list the sequence, keep the last two numbers and add them (O(n)).
+# 2. For one big fibonacci(n), use "fast doubling". With F(k) and F(k+1):
+#        F(2k)   = F(k) * (2*F(k+1) - F(k))
+#        F(2k+1) = F(k)**2 + F(k+1)**2
+#    so each recursive call halves n: fibonacci(1_000_000) recurses only
+#    20 levels deep.
+#
+# lru_cache remembers the last 256 answers, so asking again is instant,
+# while the cache can never grow without limit.
+def fibonacci_sequence(count):
+    """Yield the first `count` Fibonacci numbers."""
+    a, b = 0, 1
+    for _ in range(count):
+        yield a
+        a, b = b, a + b
+
+def fibonacci_pair(n):
+    """Return (F(n), F(n + 1)) using fast doubling."""
+    if n == 0:
+        return 0, 1
+    a, b = fibonacci_pair(n // 2)
+    c = a * (2 * b - a)    # F(2k)
+    d = a * a + b * b      # F(2k + 1)
+    if n % 2 == 0:
+        return c, d
+    return d, c + d
+
+@functools.lru_cache(maxsize=256)
 def fibonacci(n):
     if n <= 1:
         return n
-    else:
-        return fibonacci(n - 1) + fibonacci(n - 2)
+    return fibonacci_pair(n)[0]
 
 print("Fibonacci sequence (first 10 numbers):")
-for i in range(10):
-    print(fibonacci(i), end=" ")
+for number in fibonacci_sequence(10):
+    print(number, end=" ")
 print()
+print(f"Fibonacci(100): {fibonacci(100)}")
+
+# Benchmark: time to reach a Fibonacci number with a given number of digits.
+# F(n) has about 0.209 * n digits. Use max_digits=10 ** 6 for the full run
+# (fast doubling needs a few seconds; adding one by one would take hours).
+def benchmark_fibonacci(max_digits=10 ** 5, max_iterative_digits=10 ** 4):
+    results = []
+    digits = 1000
+    while digits <= max_digits:
+        n = int(digits / 0.20898764) + 1
+        start = time.perf_counter()
+        value = fibonacci_pair(n)[0]
+        doubling_seconds = time.perf_counter() - start
+        iterative_seconds = None
+        if digits <= max_iterative_digits:
+            start = time.perf_counter()
+            for last in fibonacci_sequence(n + 1):
+                pass
+            iterative_seconds = time.perf_counter() - start
+            assert last == value
+        results.append((digits, n, doubling_seconds, iterative_seconds))
+        digits *= 10
+    return results
+
+print("\nDigits       n        fast doubling   one by one")
+for digits, n, doubling_seconds, iterative_seconds in benchmark_fibonacci():
+    iterative = f"{iterative_seconds:.4f}s" if iterative_seconds is not None else "(skipped)"
+    print(f"{digits:>9,} {n:>9,}   {doubling_seconds:>10.4f}s    {iterative}")
 
 # ============================================
 # 7. SCOPE AND GLOBAL VARIABLES
@@ -228,17 +306,46 @@ print(f"25°C = {celsius_to_fahrenheit(25)}°F")
 print(f"77°F = {fahrenheit_to_celsius(77)}°C")
 
 # Check if number is prime
+# Trying every divisor up to sqrt(n) takes a million steps for n near 10**12.
+# Instead we divide by a few small primes, which rules out most numbers,
+# and then use the Miller-Rabin test: with these 12 bases it never gets
+# an answer wrong for n < 3 * 10**23 (every 64-bit number included).
+# 09_modules_packages.py has a sieve for finding many primes at once.
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
 def is_prime(n):
     """Check if a number is prime."""
+    if isinstance(n, float):
+        if not n.is_integer():
+            return False    # 17.5 (or nan, or inf) is not a whole number
+        n = int(n)          # pow() below needs an int
     if n < 2:
         return False
-    for i in range(2, int(n ** 0.5) + 1):
-        if n % i == 0:
-            return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < 41 * 41:
+        return True  # No prime factor <= 37, so no factor at all
+    # Write n - 1 as d * 2**s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in SMALL_PRIMES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False  # a proves that n is not prime
     return True
 
 print(f"\nIs 17 prime? {is_prime(17)}")
 print(f"Is 20 prime? {is_prime(20)}")
+print(f"Is 2**61 - 1 prime? {is_prime(2 ** 61 - 1)}")
 
 # Find maximum in a list
 def find_max(numbers):
@@ -6,6 +6,18 @@ Updated: Added CSV and JSON examples.
 """
 
 import os
+import re
+import csv
+import sys
+import mmap
+import struct
+import time
+import errno
+import threading
+import itertools
+import tracemalloc
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # ============================================
 # 1. WRITING TO FILES
@@ -115,6 +127,229 @@ with open("data.csv", "r") as file:
     for line in file:
         print(f"  {line.strip()}")
 
+# ",".join breaks as soon as a value contains a comma, a quote or a newline.
+# The CSV standard (RFC 4180) puts such a value in double quotes and writes
+# a quote inside it twice: Paris, "the" city  ->  "Paris, ""the"" city"
+# The writer below does that, and writes many rows with a single write() call.
+# The reader is a generator, so even a file larger than memory can be read
+# row by row, and it converts columns to int, float, ... as it goes.
+CSV_NEEDS_QUOTES = re.compile('[,"\r\n]')
+
+def format_csv_field(value):
+    """Turn one value into CSV text, quoting it if needed."""
+    if value is None:
+        return ""
+    text = value if isinstance(value, str) else str(value)
+    if CSV_NEEDS_QUOTES.search(text):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+class CSVWriter:
+    """Write rows to a CSV file in batches of `batch_size` rows."""
+    
+    def __init__(self, filename, header=None, batch_size=1000, line_end="\r\n"):
+        self.file = open(filename, "w", newline="")
+        self.batch_size = batch_size
+        self.line_end = line_end
+        self.batch = []
+        if header is not None:
+            self.write_row(header)
+    
+    def write_row(self, row):
+        texts = [value if isinstance(value, str) else format_csv_field(value) for value in row]
+        line = ",".join(texts)
+        # Fast check: only quote when the line has a special character
+        # or more commas than the separators we put in
+        if '"' in line or "\n" in line or "\r" in line or line.count(",") != len(texts) - 1:
+            line = ",".join(format_csv_field(value) for value in row)
+        if line == "" and len(texts) == 1:
+            line = '""'  # A lone empty field, not a blank line (which readers skip)
+        self.batch.append(line)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+    
+    def write_rows(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.batch_size))
+            if not chunk:
+                return
+            # Fast path for a chunk of plain strings that need no quotes
+            try:
+                lines = [",".join(row) for row in chunk]
+            except TypeError:  # Some values are not strings
+                lines = None
+            if lines is not None:
+                text = "".join(lines)
+                separators = sum(map(len, chunk)) - len(chunk)
+                if ('"' in text or "\n" in text or "\r" in text
+                        or text.count(",") != separators or "" in lines):
+                    lines = None
+            if lines is None:
+                for row in chunk:
+                    self.write_row(row)
+            else:
+                self.batch.extend(lines)
+                if len(self.batch) >= self.batch_size:
+                    self.flush()
+    
+    def flush(self):
+        if self.batch:
+            self.file.write(self.line_end.join(self.batch) + self.line_end)
+            self.batch = []
+    
+    def close(self):
+        self.flush()
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def split_csv_line(line, lines):
+    """Split one CSV record into fields.
+    
+    If a quoted field goes on past the end of the line, the rest of the
+    record is taken from `lines`.
+    """
+    fields = []
+    position = 0
+    while True:
+        if line.startswith('"', position):
+            parts = []
+            position += 1
+            while True:
+                quote = line.find('"', position)
+                if quote == -1:
+                    parts.append(line[position:])
+                    line = next(lines, None)
+                    if line is None:
+                        raise ValueError("CSV file ends inside a quoted field")
+                    position = 0
+                elif line.startswith('"', quote + 1):
+                    parts.append(line[position:quote + 1])  # "" means one "
+                    position = quote + 2
+                else:
+                    parts.append(line[position:quote])
+                    position = quote + 1
+                    break
+            fields.append("".join(parts))
+            if position >= len(line) or line[position] in "\r\n":
+                return fields
+            if line[position] != ",":
+                raise ValueError(f"Unexpected text after a quoted field: {line!r}")
+            position += 1
+        else:
+            comma = line.find(",", position)
+            if comma == -1:
+                fields.append(line[position:].rstrip("\r\n"))
+                return fields
+            fields.append(line[position:comma])
+            position = comma + 1
+
+def read_csv_rows(filename, types=None, buffer_size=1024 * 1024):
+    """Yield the header, then every row as a list.
+    
+    types maps column names to a conversion function, e.g. {"Age": int};
+    an empty value in such a column becomes None.
+    """
+    with open(filename, "r", newline="", buffering=buffer_size) as file:
+        lines = iter(file)
+        first_line = next(lines, None)
+        if first_line is None:
+            return
+        header = split_csv_line(first_line, lines)
+        yield header
+        conversions = [(header.index(name), convert) for name, convert in (types or {}).items()]
+        for line in lines:
+            if '"' in line:
+                fields = split_csv_line(line, lines)
+            elif line in ("\n", "\r\n"):
+                continue  # Skip blank lines
+            else:
+                fields = line.rstrip("\r\n").split(",")
+            for index, convert in conversions:
+                value = fields[index]
+                fields[index] = convert(value) if value != "" else None
+            yield fields
+
+def read_csv(filename, types=None):
+    """Yield each row as a dictionary: {"Name": "Alice", "Age": 25, ...}."""
+    rows = read_csv_rows(filename, types)
+    header = next(rows, None)
+    for fields in rows:
+        yield dict(zip(header, fields))
+
+def read_csv_columns(filename, types=None, batch_size=10_000):
+    """Yield batches of up to batch_size rows as {column name: list of values}."""
+    rows = read_csv_rows(filename, types)
+    header = next(rows, None)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield dict(zip(header, map(list, zip(*batch))))
+
+with CSVWriter("people.csv", header=["Name", "Age", "City"]) as writer:
+    writer.write_rows([
+        ["Alice", 25, "New York"],
+        ["Bob", 30, "London"],
+        ['Dana "DJ" Lee', 28, "Paris, France"],
+        ["Eve", None, "Multi\nline"],
+    ])
+
+print("\nReading 'people.csv' with types:")
+for person in read_csv("people.csv", types={"Age": int}):
+    print(f"  {person}")
+ages = next(read_csv_columns("people.csv", types={"Age": int}))["Age"]
+print(f"  Age column: {ages}")
+
+# Benchmark: ",".join, the csv module and CSVWriter / read_csv.
+# The ",".join file is only readable because no value has a comma in it.
+def benchmark_csv(num_rows=200_000):
+    rows = [[f"Person {i}", str(20 + i % 50), "London" if i % 2 else "Tokyo"]
+            for i in range(num_rows)]
+    header = ["Name", "Age", "City"]
+    timings = {}
+    
+    start = time.perf_counter()
+    with open("bench.csv", "w") as file:
+        for row in [header] + rows:
+            file.write(",".join(row) + "\n")
+    with open("bench.csv", "r") as file:
+        next(file)
+        ages = [int(line.strip().split(",")[1]) for line in file]
+    timings['",".join'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    with open("bench.csv", "w", newline="") as file:
+        csv_writer = csv.writer(file)
+        csv_writer.writerow(header)
+        csv_writer.writerows(rows)
+    with open("bench.csv", "r", newline="") as file:
+        reader = csv.reader(file)
+        next(reader)
+        csv_ages = [int(row[1]) for row in reader]
+    timings["csv module"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    with CSVWriter("bench.csv", header=header, batch_size=5000) as writer:
+        writer.write_rows(rows)
+    our_ages = [row[1] for row in itertools.islice(read_csv_rows("bench.csv", {"Age": int}), 1, None)]
+    timings["CSVWriter + read_csv_rows"] = time.perf_counter() - start
+    
+    os.remove("bench.csv")
+    return timings, ages == csv_ages == our_ages
+
+if __name__ == "__main__":
+    timings, same = benchmark_csv()
+    print("\nWriting and reading 200,000 rows (Age as int):")
+    for name, seconds in timings.items():
+        print(f"  {name:<26} {seconds:.3f}s")
+    print(f"  Same ages everywhere: {same}")
+
 # ============================================
 # 5. FILE OPERATIONS
 # ============================================
@@ -176,6 +411,233 @@ with open("data.json", "r") as file:
     print("Loaded JSON data:")
     print(json.dumps(loaded_data, indent=2))
 
+# indent=4 is nice to read, but the spaces and newlines make the file bigger
+# and slower to write, and json.load() must parse the whole document even
+# if we only need one record. For many records there are two better formats:
+#
+# NDJSON ("newline-delimited JSON"): one compact JSON value per line.
+#   Records can be written and read one at a time, so the file can be
+#   bigger than memory, and it is still a text file.
+#
+# A binary record file: each record is its compact JSON prefixed by its
+# length (4 bytes). At the end we store where every record starts and,
+# optionally, a sorted list of keys, so one record can be found by number
+# or by key without parsing (or even reading) any of the others:
+#
+#   b"REC1" | length, json | length, json | ... | index | footer
+#   index  = record offsets, key offsets, record number of each key, keys
+#   footer = index position, record count, key count, b"REC1"
+#
+# json.dumps(..., separators=...) builds a new encoder on every call, so we
+# make one compact encoder and reuse it. Reading many records with a single
+# json.loads("[...]") call is also much faster than one call per record.
+COMPACT_JSON = json.JSONEncoder(separators=(",", ":"))
+JSON_BATCH_SIZE = 1000
+RECORD_MAGIC = b"REC1"
+RECORD_LENGTH = struct.Struct("<I")
+RECORD_FOOTER = struct.Struct("<QQQ4s")
+
+def write_ndjson(filename, records):
+    """Write one compact JSON record per line; return the number written."""
+    encode = COMPACT_JSON.encode
+    count = 0
+    records = iter(records)
+    with open(filename, "w", encoding="utf-8", buffering=1024 * 1024) as file:
+        while True:
+            batch = list(itertools.islice(records, JSON_BATCH_SIZE))
+            if not batch:
+                return count
+            file.write("\n".join(map(encode, batch)) + "\n")
+            count += len(batch)
+
+def read_ndjson(filename):
+    """Yield the records of an NDJSON file one by one."""
+    with open(filename, "r", encoding="utf-8") as file:
+        while True:
+            lines = list(itertools.islice(file, JSON_BATCH_SIZE))
+            if not lines:
+                return
+            lines = [line for line in lines if line.strip()]  # Skip blank lines
+            if lines:
+                yield from json.loads("[" + ",".join(lines) + "]")
+
+def little_endian(values):
+    """Array bytes in little-endian order, as stored in the record file."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def write_records(filename, records, keys=None):
+    """Write records to a binary record file; return the number written.
+    
+    keys, if given, holds one string key per record, so that
+    RecordFile.get(key) can find a record by key.
+    """
+    encode = COMPACT_JSON.encode
+    offsets = array("Q")
+    position = len(RECORD_MAGIC)
+    with open(filename, "wb", buffering=1024 * 1024) as file:
+        file.write(RECORD_MAGIC)
+        for record in records:
+            payload = encode(record).encode("utf-8")
+            offsets.append(position)
+            file.write(RECORD_LENGTH.pack(len(payload)) + payload)
+            position += RECORD_LENGTH.size + len(payload)
+        
+        # Keys are sorted by their bytes so RecordFile can binary-search them
+        encoded_keys = [] if keys is None else [key.encode("utf-8") for key in keys]
+        if keys is not None and len(encoded_keys) != len(offsets):
+            raise ValueError("Need exactly one key per record")
+        order = sorted(range(len(encoded_keys)), key=encoded_keys.__getitem__)
+        key_starts = array("Q", [0])
+        for number in order:
+            key_starts.append(key_starts[-1] + len(encoded_keys[number]))
+        file.write(little_endian(offsets))
+        file.write(little_endian(key_starts))
+        file.write(little_endian(array("Q", order)))
+        file.write(b"".join(encoded_keys[number] for number in order))
+        file.write(RECORD_FOOTER.pack(position, len(offsets), len(order), RECORD_MAGIC))
+    return len(offsets)
+
+class RecordFile:
+    """Read single records from a binary record file without loading the rest."""
+    
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        # On a bad file, close it before raising: otherwise it stays open
+        # (and, on Windows, locked) until garbage collection
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            if size < len(RECORD_MAGIC) + RECORD_FOOTER.size:
+                raise ValueError(f"{filename} is not a record file")
+            self.file.seek(-RECORD_FOOTER.size, os.SEEK_END)
+            footer = self.file.read(RECORD_FOOTER.size)
+            index_position, count, key_count, magic = RECORD_FOOTER.unpack(footer)
+            if magic != RECORD_MAGIC:
+                raise ValueError(f"{filename} is not a record file")
+            self.file.seek(index_position)
+            self.offsets = self._read_array(count)
+            self.key_starts = self._read_array(key_count + 1)
+            self.key_numbers = self._read_array(key_count)
+            if len(self.key_starts) != key_count + 1 or len(self.key_numbers) != key_count:
+                raise ValueError(f"{filename} is cut short")
+            self.keys = self.file.read(self.key_starts[-1])
+            if self.file.tell() != size - RECORD_FOOTER.size:
+                raise ValueError(f"{filename} is damaged: the index doesn't end at the footer")
+        except Exception:
+            self.file.close()
+            raise
+    
+    def _read_array(self, count):
+        values = array("Q")
+        values.frombytes(self.file.read(count * values.itemsize))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def __getitem__(self, number):
+        """Read record number `number` (0 is the first)."""
+        self.file.seek(self.offsets[number])
+        (length,) = RECORD_LENGTH.unpack(self.file.read(RECORD_LENGTH.size))
+        return json.loads(self.file.read(length))
+    
+    def get(self, key, default=None):
+        """Read the record stored under `key`, using a binary search."""
+        wanted = key.encode("utf-8")
+        low, high = 0, len(self.key_numbers)
+        while low < high:
+            middle = (low + high) // 2
+            if self.keys[self.key_starts[middle]:self.key_starts[middle + 1]] < wanted:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.key_numbers) and self.keys[self.key_starts[low]:self.key_starts[low + 1]] == wanted:
+            return self[self.key_numbers[low]]
+        return default
+    
+    def __iter__(self):
+        """Yield every record, reading the file from start to end."""
+        self.file.seek(len(RECORD_MAGIC))
+        for batch_start in range(0, len(self), JSON_BATCH_SIZE):
+            payloads = []
+            for _ in range(min(JSON_BATCH_SIZE, len(self) - batch_start)):
+                (length,) = RECORD_LENGTH.unpack(self.file.read(RECORD_LENGTH.size))
+                payloads.append(self.file.read(length))
+            yield from json.loads(b"[" + b",".join(payloads) + b"]")
+    
+    def close(self):
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+people = [data, {"name": "Bob", "age": 30, "city": "London", "hobbies": ["chess"]}]
+write_ndjson("people.ndjson", people)
+print(f"\nFrom 'people.ndjson': {[person['name'] for person in read_ndjson('people.ndjson')]}")
+write_records("people.rec", people, keys=[person["name"] for person in people])
+with RecordFile("people.rec") as records:
+    print(f"From 'people.rec', only Bob: {records.get('Bob')}")
+
+# Benchmark: indented JSON, NDJSON and the record file, plus reading one record
+def benchmark_serialization(num_records=100_000):
+    records = [{"id": i, "name": f"Person {i}", "age": 20 + i % 50,
+                "city": "London", "hobbies": ["reading", "coding"]} for i in range(num_records)]
+    keys = [str(i) for i in range(num_records)]
+    middle = num_records // 2
+    results = []
+    
+    def run(name, filename, write, read_all, read_one):
+        start = time.perf_counter()
+        write()
+        write_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        round_trip = read_all() == records
+        read_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        one = read_one()
+        one_seconds = time.perf_counter() - start
+        results.append((name, os.path.getsize(filename), write_seconds, read_seconds,
+                        one_seconds, round_trip and one == records[middle]))
+        os.remove(filename)
+    
+    def write_indented():
+        with open("bench.json", "w") as file:
+            json.dump(records, file, indent=4)
+    
+    def read_indented():
+        with open("bench.json", "r") as file:
+            return json.load(file)
+    
+    def read_one_record():
+        with RecordFile("bench.rec") as record_file:
+            return record_file.get(str(middle))
+    
+    def read_all_records():
+        with RecordFile("bench.rec") as record_file:
+            return list(record_file)
+    
+    run("indented JSON", "bench.json", write_indented, read_indented,
+        lambda: read_indented()[middle])
+    run("NDJSON", "bench.ndjson", lambda: write_ndjson("bench.ndjson", records),
+        lambda: list(read_ndjson("bench.ndjson")),
+        lambda: next(itertools.islice(read_ndjson("bench.ndjson"), middle, None)))
+    run("record file", "bench.rec", lambda: write_records("bench.rec", records, keys),
+        read_all_records, read_one_record)
+    return results
+
+if __name__ == "__main__":
+    print("\n100,000 records:         size    write     read  one record  round trip")
+    for name, size, write_seconds, read_seconds, one_seconds, correct in benchmark_serialization():
+        print(f"  {name:<14} {size / 1e6:6.1f} MB  {write_seconds:6.3f}s  {read_seconds:6.3f}s"
+              f"  {one_seconds * 1000:8.2f}ms  {correct}")
+
 # ============================================
 # 8. PRACTICAL EXAMPLES
 # ============================================
@@ -183,49 +645,377 @@ with open("data.json", "r") as file:
 print("\n=== Practical Examples ===\n")
 
 # Copy file content
-def copy_file(source, destination):
+# The file is copied in binary mode, one chunk at a time, so any kind of file
+# works and memory use stays the same for a 1 KB or a 10 GB file.
+# Where the operating system can copy for us (os.copy_file_range where it
+# exists, os.sendfile on Linux) the data never even passes through Python.
+# macOS and the BSDs have os.sendfile too, but there it can only send to a
+# socket, not to a file, so (like shutil) we only use it on Linux.
+# Otherwise we read into one reusable buffer with readinto().
+COPY_CHUNK_SIZE = 1024 * 1024  # 1 MB
+COPY_METHODS = ("copy_file_range", "sendfile", "readinto")
+
+# Errors meaning "this method can't copy these two files, try the next one"
+COPY_FALLBACK_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                        errno.EBADF, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+def kernel_copy(method, src, dst, total, progress, chunk_size):
+    """Copy with os.copy_file_range or os.sendfile; None if not supported."""
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    if method == "copy_file_range":
+        if not hasattr(os, "copy_file_range"):
+            return None
+        copy_chunk = lambda copied: os.copy_file_range(src_fd, dst_fd, chunk_size)
+    else:
+        if not hasattr(os, "sendfile") or not sys.platform.startswith("linux"):
+            return None
+        copy_chunk = lambda copied: os.sendfile(dst_fd, src_fd, copied, chunk_size)
+    copied = 0
+    while True:
+        try:
+            sent = copy_chunk(copied)
+        except OSError as error:
+            if copied == 0 and error.errno in COPY_FALLBACK_ERRORS:
+                return None
+            raise
+        if sent == 0:
+            return copied
+        copied += sent
+        if progress:
+            progress(copied, total)
+
+def buffered_copy(src, dst, total, progress, chunk_size):
+    """Copy by reading into the same buffer again and again."""
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    copied = 0
+    while True:
+        size = src.readinto(buffer)
+        if not size:
+            return copied
+        # dst is unbuffered, so one write() may take only part of the data
+        written = 0
+        while written < size:
+            written += dst.write(view[written:size])
+        copied += size
+        if progress:
+            progress(copied, total)
+
+def copy_file_contents(source, destination, progress=None, method="auto",
+                       chunk_size=COPY_CHUNK_SIZE):
+    """Copy source to destination and return the number of bytes copied.
+    
+    progress, if given, is called as progress(bytes_copied, total_bytes).
+    method is "auto" or one of COPY_METHODS.
+    """
+    methods = COPY_METHODS if method == "auto" else (method,)
+    with open(source, "rb", buffering=0) as src, open(destination, "wb", buffering=0) as dst:
+        total = os.fstat(src.fileno()).st_size
+        for name in methods:
+            if name == "readinto":
+                return buffered_copy(src, dst, total, progress, chunk_size)
+            copied = kernel_copy(name, src, dst, total, progress, chunk_size)
+            if copied is not None:
+                return copied
+        raise ValueError(f"Copy method {method!r} is not available here")
+
+def copy_file(source, destination, progress=None):
     """Copy content from source file to destination file."""
     try:
-        with open(source, "r") as src:
-            content = src.read()
-        with open(destination, "w") as dst:
-            dst.write(content)
+        copied = copy_file_contents(source, destination, progress)
         print(f"Copied {source} to {destination}")
+        return copied
     except FileNotFoundError:
         print(f"Error: {source} not found")
+        return 0
+
+def copy_files(pairs, workers=4, progress=None):
+    """Copy many (source, destination) pairs at once; return total bytes.
+    
+    The copies run in threads, which is enough here: the real work happens
+    in the operating system, outside Python's global lock.
+    progress, if given, is called as progress(bytes_copied, total_bytes)
+    for all files together.
+    """
+    pairs = list(pairs)
+    total = sum(os.path.getsize(source) for source, _ in pairs)
+    lock = threading.Lock()
+    done = [0]  # Bytes copied by all threads
+    
+    def copy_one(pair):
+        last = [0]
+        def file_progress(copied, file_total):
+            with lock:
+                done[0] += copied - last[0]
+                last[0] = copied
+                progress(done[0], total)
+        return copy_file_contents(*pair, progress=file_progress if progress else None)
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(copy_one, pairs))
 
 copy_file("renamed_example.txt", "copy_example.txt")
 
+# Progress callbacks and parallel copies
+def show_progress(copied, total):
+    print(f"  ...{copied} of {total} bytes")
+
+copy_file("example2.txt", "copy_example2.txt", progress=show_progress)
+copied = copy_files([("example2.txt", f"copy_{i}_example2.txt") for i in range(3)], workers=3)
+print(f"Copied 3 files in parallel: {copied} bytes")
+for i in range(3):
+    os.remove(f"copy_{i}_example2.txt")
+
+# Benchmark: throughput of each method, and peak Python memory while copying.
+# Try sizes=(1, 100, 1000, 10_000) for a 1 MB to 10 GB run (needs the disk space).
+def benchmark_copy(sizes_mb=(1, 16, 128)):
+    block = os.urandom(COPY_CHUNK_SIZE)
+    results = []
+    for size_mb in sizes_mb:
+        with open("bench_source.bin", "wb") as file:
+            for _ in range(size_mb):
+                file.write(block)
+        for method in COPY_METHODS:
+            tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                copy_file_contents("bench_source.bin", "bench_copy.bin", method=method)
+            except ValueError:
+                tracemalloc.stop()
+                continue  # Method not available on this system
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append((size_mb, method, size_mb / seconds, peak))
+    os.remove("bench_source.bin")
+    os.remove("bench_copy.bin")
+    return results
+
+# It writes and copies about 145 MB, so it only runs when this file is run
+# as a script, not when it is imported
+if __name__ == "__main__":
+    print("\nCopy throughput:")
+    for size_mb, method, rate, peak in benchmark_copy():
+        print(f"  {size_mb:>5} MB  {method:<16} {rate:>8,.0f} MB/s  peak memory {peak / 1024:,.0f} KB")
+
 # Count lines in a file
+# We never decode the text or build line objects: we read raw bytes into one
+# reusable buffer and let bytearray.count() find the line endings.
+# The result is the same as len(file.readlines()) in text mode:
+#   - "\n", "\r\n" and a lone "\r" each end a line
+#   - a last line without a line ending still counts
+COUNT_BLOCK_SIZE = 4 * 1024 * 1024  # 4 MB
+
 def count_lines(filename):
     """Count the number of lines in a file."""
     try:
-        with open(filename, "r") as file:
-            return len(file.readlines())
+        with open(filename, "rb", buffering=0) as file:
+            buffer = bytearray(COUNT_BLOCK_SIZE)
+            lines = 0
+            last_byte = b""
+            while True:
+                size = file.readinto(buffer)
+                if not size:
+                    break
+                lines += buffer.count(b"\n", 0, size)
+                if buffer.find(b"\r", 0, size) != -1:
+                    # Count lone "\r" too, but "\r\n" only once
+                    lines += buffer.count(b"\r", 0, size) - buffer.count(b"\r\n", 0, size)
+                if last_byte == b"\r" and buffer[0] == ord("\n"):
+                    lines -= 1  # A "\r\n" split between two blocks
+                last_byte = buffer[size - 1:size]
+            if last_byte and last_byte not in b"\r\n":
+                lines += 1  # Last line has no line ending
+            return lines
     except FileNotFoundError:
         return 0
 
 line_count = count_lines("renamed_example.txt")
 print(f"Number of lines in 'renamed_example.txt': {line_count}")
 
+def count_lines_in_files(filenames, workers=8):
+    """Count lines in many files at once; return {filename: lines}."""
+    filenames = list(filenames)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(filenames, pool.map(count_lines, filenames)))
+
+print(count_lines_in_files(["renamed_example.txt", "example2.txt", "missing.txt"]))
+
+# Benchmark against the old version, which builds a list of every line.
+# Raise num_lines for a multi-GB log (the old version needs that much memory).
+def benchmark_count_lines(num_lines=1_000_000):
+    line = b"2024-01-01 12:00:00 INFO request handled in 12 ms by worker 7\n"
+    with open("bench_log.txt", "wb") as file:
+        for _ in range(num_lines // 10_000):
+            file.write(line * 10_000)
+    
+    def count_lines_readlines(filename):
+        with open(filename, "r") as file:
+            return len(file.readlines())
+    
+    timings = []
+    for function in (count_lines_readlines, count_lines):
+        start = time.perf_counter()
+        lines = function("bench_log.txt")
+        timings.append((time.perf_counter() - start, lines))
+    os.remove("bench_log.txt")
+    return timings
+
+if __name__ == "__main__":
+    (old_seconds, old_lines), (new_seconds, new_lines) = benchmark_count_lines()
+    print(f"Counting {new_lines:,} lines: readlines {old_seconds:.3f}s, "
+          f"byte blocks {new_seconds:.3f}s ({old_seconds / new_seconds:.0f}x faster, "
+          f"same result: {old_lines == new_lines})")
+
 # Search for text in file
+# Instead of lowercasing every line, we memory-map the file (the operating
+# system pages it in as needed) and work through it in big blocks of whole
+# lines. Each block is lowercased once and every search term is found with
+# bytes.find(), which is much faster in CPython than a regular expression
+# like "error|warning" with re.IGNORECASE.
+# Line numbers are only worked out for lines that match, by counting the
+# "\n" bytes since the previous match.
+# Like text mode (and count_lines above), "\r\n" and a lone "\r" also end
+# a line: a block that has any "\r" in it is rewritten to use only "\n".
+# bytes.lower() only knows ASCII letters, so terms with other characters
+# use the simple line-by-line search instead.
+SEARCH_BLOCK_SIZE = 4 * 1024 * 1024  # 4 MB
+
+def find_block_end(data, position, size):
+    """Index just after the first line ending at or after position."""
+    newline = data.find(b"\n", position)
+    # Only look for "\r" up to the next "\n", not through the whole file
+    carriage_return = data.find(b"\r", position, size if newline == -1 else newline)
+    if carriage_return != -1:
+        if data[carriage_return + 1:carriage_return + 2] == b"\n":
+            return carriage_return + 2  # "\r\n"
+        return carriage_return + 1
+    return size if newline == -1 else newline + 1
+
+def matching_line_starts(block, terms):
+    """Sorted start offsets of the lines in block that contain any term."""
+    starts = set()
+    for term in terms:
+        position = block.find(term)
+        # An empty term matches every line (as "" in line does), but
+        # find() also "finds" it at the very end of the block
+        while position != -1 and position < len(block):
+            starts.add(block.rfind(b"\n", 0, position) + 1)
+            line_end = block.find(b"\n", position)
+            if line_end == -1:
+                break
+            position = block.find(term, line_end + 1)  # One hit per line is enough
+    return sorted(starts)
+
+def search_lines(filename, terms):
+    """Yield (line_number, line) for each line that contains any term."""
+    if not all(term.isascii() for term in terms):
+        lowered = [term.lower() for term in terms]
+        with open(filename, "r") as file:
+            for line_num, line in enumerate(file, 1):
+                line_lower = line.lower()
+                if any(term in line_lower for term in lowered):
+                    yield line_num, line.strip()
+        return
+    byte_terms = [term.lower().encode() for term in terms]
+    with open(filename, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return  # mmap can't map an empty file
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            line_num = 1
+            block_start = 0
+            while block_start < size:
+                # End the block after a line ending so no line is split in two
+                block_end = find_block_end(data, min(block_start + SEARCH_BLOCK_SIZE, size) - 1, size)
+                text = data[block_start:block_end]
+                if b"\r" in text:
+                    text = text.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+                block = text.lower()
+                counted_up_to = 0
+                for line_start in matching_line_starts(block, byte_terms):
+                    line_num += block.count(b"\n", counted_up_to, line_start)
+                    counted_up_to = line_start
+                    line_end = block.find(b"\n", line_start)
+                    if line_end == -1:
+                        line_end = len(block)
+                    line = text[line_start:line_end]
+                    yield line_num, line.decode("utf-8", "replace").strip()
+                line_num += block.count(b"\n", counted_up_to)
+                block_start = block_end
+
 def search_in_file(filename, search_term):
     """Search for a term in a file and return matching lines."""
-    matches = []
     try:
-        with open(filename, "r") as file:
-            for line_num, line in enumerate(file, 1):
-                if search_term.lower() in line.lower():
-                    matches.append((line_num, line.strip()))
+        return list(search_lines(filename, [search_term]))
     except FileNotFoundError:
         print(f"Error: {filename} not found")
-    return matches
+        return []
 
 matches = search_in_file("renamed_example.txt", "Python")
 print(f"\nLines containing 'Python':")
 for line_num, line in matches:
     print(f"  Line {line_num}: {line}")
 
+# Search a whole folder tree; results for each file come out as soon as
+# that file is done. Threads work well here: reading and mapping the files
+# is the slow part, and lower() and find() run in C.
+def search_tree(root, terms, workers=4, extensions=(".txt", ".py", ".log", ".csv")):
+    """Yield (filename, line_number, line) for matches under root."""
+    filenames = [os.path.join(folder, name)
+                 for folder, _, names in os.walk(root)
+                 for name in sorted(names) if name.endswith(extensions)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(lambda name: list(search_lines(name, terms)), name): name
+                   for name in filenames}
+        for future in as_completed(futures):
+            for line_num, line in future.result():
+                yield futures[future], line_num, line
+
+# A small folder tree to search
+os.makedirs(os.path.join("search_demo", "logs"), exist_ok=True)
+copy_file_contents("renamed_example.txt", os.path.join("search_demo", "notes.txt"))
+with open(os.path.join("search_demo", "logs", "app.log"), "w") as file:
+    file.write("started\nLine 2 of the log\nstopped\n")
+
+print("\nSearching 'search_demo' for 'appended' or 'Line 2':")
+for filename, line_num, line in search_tree("search_demo", ["appended", "Line 2"]):
+    print(f"  {filename}:{line_num}: {line}")
+
+# Benchmark: the old one-term-at-a-time search against one pass for all terms.
+# Raise num_lines (about 65 bytes per line) for a multi-GB file.
+def benchmark_search(num_lines=500_000, terms=("timeout", "Refused", "disk full")):
+    lines = [b"2024-01-01 12:00:00 INFO request handled in 12 ms by worker 7\n"] * 997
+    lines += [b"2024-01-01 12:00:01 WARN upstream timeout after 30 s\n",
+              b"2024-01-01 12:00:02 ERROR connection refused by db-1\n",
+              b"2024-01-01 12:00:03 ERROR disk full on /var\n"]
+    with open("bench_search.log", "wb") as file:
+        for _ in range(num_lines // 1000):
+            file.writelines(lines)
+    
+    def search_in_file_lines(filename, search_term):
+        matches = []
+        with open(filename, "r") as file:
+            for line_num, line in enumerate(file, 1):
+                if search_term.lower() in line.lower():
+                    matches.append((line_num, line.strip()))
+        return matches
+    
+    start = time.perf_counter()
+    old_matches = sorted(match for term in terms for match in search_in_file_lines("bench_search.log", term))
+    old_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    new_matches = list(search_lines("bench_search.log", terms))
+    new_seconds = time.perf_counter() - start
+    os.remove("bench_search.log")
+    return old_seconds, new_seconds, old_matches == new_matches, len(new_matches)
+
+if __name__ == "__main__":
+    old_seconds, new_seconds, same, found = benchmark_search()
+    print(f"Searching for 3 terms: line by line {old_seconds:.3f}s, "
+          f"one mapped pass {new_seconds:.3f}s ({old_seconds / new_seconds:.0f}x faster, "
+          f"{found:,} matches, same result: {same})")
+
 print("\n=== File Handling Complete ===")
 print("Check the created files: example2.txt, example3.txt, data.csv, data.json, etc.")
 
@@ -5,6 +5,21 @@ Learn how to create classes and work with objects in Python.
 Updated: Added inheritance and polymorphism examples.
 """
 
+import os
+import re
+import sys
+import math
+import mmap
+import time
+import heapq
+import struct
+import random
+import asyncio
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
 # ============================================
 # 1. BASIC CLASS AND OBJECT
 # ============================================
@@ -309,18 +324,41 @@ class Library:
     def __init__(self, name):
         self.name = name
         self.books = []
+        # Indexes (dictionaries) so lookups don't loop over every book
+        self.by_title = {}     # Casefolded title -> first book with that title
+        self.by_isbn = {}      # ISBN -> book
+        self.by_author = {}    # Casefolded author -> list of books
+    
+    def _index_book(self, book):
+        self.books.append(book)
+        self.by_title.setdefault(book.title.casefold(), book)
+        self.by_isbn.setdefault(book.isbn, book)
+        self.by_author.setdefault(book.author.casefold(), []).append(book)
     
     def add_book(self, book):
         """Add a book to the library."""
-        self.books.append(book)
+        self._index_book(book)
         print(f"Added: {book.title}")
     
+    def add_books(self, books):
+        """Add many books at once, without a message for each one."""
+        count = 0
+        for book in books:
+            self._index_book(book)
+            count += 1
+        print(f"Added {count} books")
+    
     def find_book(self, title):
-        """Find a book by title."""
-        for book in self.books:
-            if book.title.lower() == title.lower():
-                return book
-        return None
+        """Find a book by title (not case-sensitive)."""
+        return self.by_title.get(title.casefold())
+    
+    def find_by_isbn(self, isbn):
+        """Find a book by ISBN."""
+        return self.by_isbn.get(isbn)
+    
+    def find_by_author(self, author):
+        """Find all books by an author (not case-sensitive)."""
+        return list(self.by_author.get(author.casefold(), []))
     
     def borrow_book(self, title):
         """Borrow a book from the library."""
@@ -361,3 +399,541 @@ library.list_books()
 print(f"\n{library.return_book('Python Basics')}")
 library.list_books()
 
+print(f"\nBy ISBN 789012: {library.find_by_isbn('789012')}")
+print(f"By author 'jane smith': {[str(book) for book in library.find_by_author('jane smith')]}")
+
+# Benchmark: borrow and return with the indexes, compared with looping
+# over every book like find_book used to do
+def benchmark_checkouts(num_books=100_000, num_checkouts=100_000):
+    """Return checkouts per second with and without indexes."""
+    big_library = Library("Benchmark Library")
+    big_library.add_books(Book(f"Title {i}", f"Author {i % 1000}", f"ISBN{i:09d}")
+                          for i in range(num_books))
+    titles = [f"title {i * 7919 % num_books}" for i in range(num_checkouts)]
+    
+    start = time.perf_counter()
+    for title in titles:
+        big_library.borrow_book(title)
+        big_library.return_book(title)
+    indexed_rate = num_checkouts / (time.perf_counter() - start)
+    
+    def linear_find(title):
+        for book in big_library.books:
+            if book.title.lower() == title.lower():
+                return book
+        return None
+    
+    linear_checkouts = 20   # Looping is slow, so only time a few
+    start = time.perf_counter()
+    for title in titles[:linear_checkouts]:
+        linear_find(title).is_borrowed = True
+        linear_find(title).is_borrowed = False
+    linear_rate = linear_checkouts / (time.perf_counter() - start)
+    return indexed_rate, linear_rate
+
+# Raise num_books to 1_000_000 for a full-size run
+if __name__ == "__main__":
+    indexed_rate, linear_rate = benchmark_checkouts()
+    print("\nCheckouts per second with 100,000 books:")
+    print(f"  Indexed: {indexed_rate:,.0f}")
+    print(f"  Linear scan: {linear_rate:,.0f}")
+
+# ============================================
+# 10. THREAD-SAFE LIBRARY (MANY COPIES PER BOOK)
+# ============================================
+
+print("\n=== Thread-Safe Library ===\n")
+
+# borrow_book checks "is it borrowed?" and then sets is_borrowed = True.
+# If two threads run it at the same moment, both can pass the check before
+# either sets the flag, and the same copy is lent out twice.
+#
+# ConcurrentLibrary makes check-and-update one step by doing it while
+# holding a lock. One lock for the whole library would make every thread
+# wait for every other, so books are spread over many locks ("lock
+# striping"): two threads only wait for each other when their books share
+# a lock.
+
+class ConcurrentLibrary(Library):
+    def __init__(self, name, stripes=64):
+        super().__init__(name)
+        self.catalog_lock = threading.Lock()   # Guards adding books
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.copies = {}      # ISBN -> number of copies owned
+        self.available = {}   # ISBN -> number of copies on the shelf
+    
+    def _lock_for(self, book):
+        return self.locks[hash(book.isbn) % len(self.locks)]
+    
+    def _index_book(self, book, copies=1):
+        if copies < 1:
+            raise ValueError("A library needs at least one copy of a book")
+        with self.catalog_lock:
+            if book.isbn not in self.by_isbn:
+                # Create the counts first: as soon as the book is in the
+                # indexes, other threads can find it and borrow it
+                self.copies[book.isbn] = 0
+                self.available[book.isbn] = 0
+                super()._index_book(book)
+            book = self.by_isbn[book.isbn]
+        with self._lock_for(book):
+            self.copies[book.isbn] += copies
+            self.available[book.isbn] += copies
+            book.is_borrowed = False
+    
+    def add_book(self, book, copies=1):
+        """Add a book, or more copies of a book the library already has."""
+        self._index_book(book, copies)
+        print(f"Added: {book.title} ({copies} copies)")
+    
+    # The two methods below must be called while holding the book's lock
+    def _borrow(self, title, book):
+        if self.available[book.isbn] == 0:
+            return f"'{title}' is already borrowed"
+        self.available[book.isbn] -= 1
+        book.is_borrowed = self.available[book.isbn] == 0
+        return f"Borrowed: {book.title}"
+    
+    def _return(self, title, book):
+        if self.available[book.isbn] == self.copies[book.isbn]:
+            return f"'{title}' is not currently borrowed"
+        self.available[book.isbn] += 1
+        book.is_borrowed = False
+        return f"Returned: {book.title}"
+    
+    def borrow_book(self, title):
+        """Borrow a copy of a book (safe to call from many threads)."""
+        book = self.find_book(title)
+        if book is None:
+            return f"'{title}' not found in library"
+        with self._lock_for(book):
+            return self._borrow(title, book)
+    
+    def return_book(self, title):
+        """Return a copy of a book (safe to call from many threads)."""
+        book = self.find_book(title)
+        if book is None:
+            return f"'{title}' not found in library"
+        with self._lock_for(book):
+            return self._return(title, book)
+    
+    # asyncio versions: waiting for a lock must not block the event loop,
+    # so we only *try* to take it. If it is busy we sleep and try again,
+    # doubling the wait each time (up to 10 ms) so a long wait doesn't keep
+    # the event loop spinning.
+    async def _acquire(self, lock):
+        delay = 0.0001
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.01)
+    
+    async def borrow_book_async(self, title):
+        book = self.find_book(title)
+        if book is None:
+            return f"'{title}' not found in library"
+        lock = self._lock_for(book)
+        await self._acquire(lock)
+        try:
+            return self._borrow(title, book)
+        finally:
+            lock.release()
+    
+    async def return_book_async(self, title):
+        book = self.find_book(title)
+        if book is None:
+            return f"'{title}' not found in library"
+        lock = self._lock_for(book)
+        await self._acquire(lock)
+        try:
+            return self._return(title, book)
+        finally:
+            lock.release()
+    
+    def check_consistency(self):
+        """Return a list of problems (empty if every count makes sense)."""
+        problems = []
+        with self.catalog_lock:
+            books = list(self.by_isbn.items())
+        for isbn, book in books:
+            with self._lock_for(book):
+                available, copies = self.available[isbn], self.copies[isbn]
+                if not 0 <= available <= copies:
+                    problems.append(f"{isbn}: {available} of {copies} available")
+                if book.is_borrowed != (available == 0):
+                    problems.append(f"{isbn}: is_borrowed is {book.is_borrowed}")
+        return problems
+
+shared_library = ConcurrentLibrary("Shared Library")
+shared_library.add_book(Book("Python Basics", "John Doe", "123456"), copies=3)
+
+# Ten threads race for three copies: exactly three should succeed
+results = []
+threads = [threading.Thread(target=lambda: results.append(shared_library.borrow_book("Python Basics")))
+           for _ in range(10)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(f"Successful borrows: {sum(result.startswith('Borrowed') for result in results)} of 10")
+
+async def return_all():
+    return await asyncio.gather(*(shared_library.return_book_async("Python Basics")
+                                  for _ in range(4)))
+
+print(f"Async returns: {asyncio.run(return_all())}")
+print(f"Consistency problems: {shared_library.check_consistency()}")
+
+# Contention benchmark: threads borrowing and returning random books.
+# Note: CPython's GIL runs one thread's Python code at a time, so the
+# striped locks mostly show up as less waiting, not as more cores used.
+def benchmark_contention(num_titles=1000, operations_per_thread=5_000):
+    results = {}
+    for stripes in (1, 64):
+        for num_threads in (1, 2, 4, 8):
+            contended = ConcurrentLibrary("Benchmark", stripes)
+            for i in range(num_titles):
+                contended._index_book(Book(f"Title {i}", "Author", f"ISBN{i}"), copies=2)
+            
+            def worker(seed):
+                rng = random.Random(seed)
+                for _ in range(operations_per_thread):
+                    title = f"Title {rng.randrange(num_titles)}"
+                    if contended.borrow_book(title).startswith("Borrowed"):
+                        contended.return_book(title)
+            
+            workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(num_threads)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            seconds = time.perf_counter() - start
+            ok = not contended.check_consistency()
+            results[(stripes, num_threads)] = (num_threads * operations_per_thread / seconds, ok)
+    return results
+
+if __name__ == "__main__":
+    print("\nBorrow/return operations per second:")
+    for (stripes, num_threads), (rate, ok) in benchmark_contention().items():
+        print(f"  {stripes:2d} lock(s), {num_threads} thread(s): {rate:,.0f} (consistent: {ok})")
+
+# ============================================
+# 11. FULL-TEXT SEARCH (INVERTED INDEX)
+# ============================================
+
+print("\n=== Full-Text Search ===\n")
+
+# find_book needs the exact title. For keyword search we build an
+# "inverted index": for every word, the list of books (by number) whose
+# title or author contains it, and how often. Those lists are kept in
+# typed arrays, sorted by book number, which keeps them small and lets us
+# walk through them quickly.
+#
+# Results are ranked with BM25, a standard scoring formula: rare words
+# count more than common ones, and a match in a short title counts more
+# than one in a long title.
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def tokenize(text):
+    """Split text into lowercase words."""
+    return WORD_PATTERN.findall(text.casefold())
+
+def gallop(doc_ids, doc_id, start):
+    """Return the first position at or after start where doc_ids[position] >= doc_id.
+    
+    doc_ids must be sorted. We try steps of 1, 2, 4, 8, ... until we pass
+    doc_id, then binary-search the last step. When the book is close to
+    start (the usual case) this needs only a couple of comparisons.
+    """
+    end = len(doc_ids)
+    step = 1
+    low = start
+    while start < end and doc_ids[start] < doc_id:
+        low = start + 1
+        start += step
+        step *= 2
+    return bisect_left(doc_ids, doc_id, low, min(start, end))
+
+class BM25Search:
+    """Query and ranking code shared by the in-memory and on-disk indexes.
+    
+    Subclasses provide num_docs, total_length, _postings(term) and
+    _doc_length(doc_id).
+    """
+    k1 = 1.2    # How quickly repeating a word stops adding to the score
+    b = 0.75    # How much long documents are penalized
+    
+    def _idf(self, document_frequency):
+        return math.log(1 + (self.num_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+    
+    def search(self, query, mode="and", limit=10):
+        """Return up to `limit` (doc_id, score) pairs, best first.
+        
+        mode="and" needs every word of the query, mode="or" any of them.
+        """
+        if mode not in ("and", "or"):
+            raise ValueError(f"Unknown mode: {mode!r}")
+        postings = []
+        for term in dict.fromkeys(tokenize(query)):
+            doc_ids, counts = self._postings(term)
+            if len(doc_ids):
+                postings.append((doc_ids, counts, self._idf(len(doc_ids))))
+            elif mode == "and":
+                return []
+        if not postings:
+            return []
+        
+        # BM25 score of one word in one book:
+        #   idf * count * (k1 + 1) / (count + k1 * (1 - b + b * length / average))
+        k1, b = self.k1, self.b
+        length_weight = k1 * b * self.num_docs / self.total_length
+        doc_length = self._doc_length
+        scores = {}
+        
+        if mode == "or":
+            for doc_ids, counts, idf in postings:
+                for doc_id, count in zip(doc_ids, counts):
+                    norm = k1 * (1 - b) + length_weight * doc_length(doc_id)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * count * (k1 + 1) / (count + norm)
+        else:
+            # Walk the shortest list and gallop to each book in the others.
+            # Every list is sorted by book number and we look for books in
+            # increasing order, so each search starts where the last one
+            # ended. The work grows with the shortest list, not the longest,
+            # and the on-disk index only reads the parts of the long lists
+            # that the searches touch.
+            postings.sort(key=lambda posting: len(posting[0]))
+            shortest_ids, shortest_counts, shortest_idf = postings[0]
+            others = postings[1:]
+            starts = [0] * len(others)
+            for doc_id, count in zip(shortest_ids, shortest_counts):
+                matched = []
+                for number, (doc_ids, counts, idf) in enumerate(others):
+                    position = gallop(doc_ids, doc_id, starts[number])
+                    starts[number] = position
+                    if position == len(doc_ids) or doc_ids[position] != doc_id:
+                        break
+                    matched.append((counts[position], idf))
+                else:
+                    norm = k1 * (1 - b) + length_weight * doc_length(doc_id)
+                    score = shortest_idf * count * (k1 + 1) / (count + norm)
+                    for other_count, idf in matched:
+                        score += idf * other_count * (k1 + 1) / (other_count + norm)
+                    scores[doc_id] = score
+                    continue
+                if position == len(doc_ids):
+                    break   # One list has no more books, so no more matches
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+class BookSearchIndex(BM25Search):
+    """Inverted index kept in memory and updated as books are added."""
+    
+    def __init__(self):
+        self.postings = {}              # Word -> (book numbers, counts)
+        self.doc_lengths = array("I")   # Words in each book's text
+        self.total_length = 0
+    
+    @property
+    def num_docs(self):
+        return len(self.doc_lengths)
+    
+    def add(self, doc_id, text):
+        """Index the text of book number doc_id (numbers must increase)."""
+        if doc_id != len(self.doc_lengths):
+            raise ValueError("Books must be added in order")
+        words = tokenize(text)
+        self.doc_lengths.append(len(words))
+        self.total_length += len(words)
+        for word, count in Counter(words).items():
+            if word not in self.postings:
+                self.postings[word] = (array("I"), array("I"))
+            doc_ids, counts = self.postings[word]
+            doc_ids.append(doc_id)
+            counts.append(count)
+    
+    def _postings(self, term):
+        return self.postings.get(term, ((), ()))
+    
+    def _doc_length(self, doc_id):
+        return self.doc_lengths[doc_id]
+    
+    def save(self, filename):
+        """Write the index in the format MappedBookSearchIndex reads."""
+        terms = sorted(self.postings)
+        term_bytes = bytearray()
+        term_offsets = array("Q", [0])
+        posting_offsets = array("Q", [0])
+        all_doc_ids = array("I")
+        all_counts = array("I")
+        for term in terms:
+            term_bytes += term.encode("utf-8")
+            term_offsets.append(len(term_bytes))
+            doc_ids, counts = self.postings[term]
+            all_doc_ids.extend(doc_ids)
+            all_counts.extend(counts)
+            posting_offsets.append(len(all_doc_ids))
+        
+        header = struct.pack(INDEX_HEADER, INDEX_MAGIC, self.num_docs, len(terms),
+                             len(all_doc_ids), self.total_length)
+        with open(filename, "wb") as file:
+            file.write(header)
+            for section in (self.doc_lengths, term_offsets, posting_offsets,
+                            all_doc_ids, all_counts):
+                section = array(section.typecode, section)
+                if sys.byteorder == "big":
+                    section.byteswap()    # The file is always little-endian
+                data = section.tobytes()
+                file.write(data + bytes(-len(data) % 8))   # Keep 8-byte alignment
+            file.write(term_bytes)
+
+# File layout: header, then five arrays, then all words (UTF-8) back to back
+INDEX_MAGIC = b"BOOKIDX1"
+INDEX_HEADER = "<8sQQQQ"   # magic, books, words, postings, total length
+
+class MappedBookSearchIndex(BM25Search):
+    """Read-only index opened with mmap.
+    
+    Opening only reads the header; the operating system loads the rest
+    of the file into memory as searches touch it, so start-up is instant
+    even for a big index.
+    """
+    
+    def __init__(self, filename):
+        if sys.byteorder != "little":
+            raise ValueError("MappedBookSearchIndex needs a little-endian machine")
+        self.file = open(filename, "rb")
+        self.views = []
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+        # On a bad file, close what we opened before raising: otherwise the
+        # file stays open (and, on Windows, locked) until garbage collection
+        try:
+            if len(self.map) < struct.calcsize(INDEX_HEADER):
+                raise ValueError(f"{filename} is not a book index")
+            magic, self.num_docs, self.num_terms, num_postings, self.total_length = \
+                struct.unpack_from(INDEX_HEADER, self.map)
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"{filename} is not a book index")
+            
+            position = struct.calcsize(INDEX_HEADER)
+            sections = []
+            for typecode, count in (("I", self.num_docs), ("Q", self.num_terms + 1),
+                                    ("Q", self.num_terms + 1), ("I", num_postings),
+                                    ("I", num_postings)):
+                size = count * array(typecode).itemsize
+                if position + size > len(self.map):
+                    raise ValueError(f"{filename} is cut short")
+                view = memoryview(self.map)[position:position + size]
+                self.views.append(view)
+                sections.append(view.cast(typecode))
+                self.views.append(sections[-1])
+                position += size + (-size % 8)
+            (self.doc_lengths, self.term_offsets, self.posting_offsets,
+             self.doc_ids, self.counts) = sections
+            self.term_bytes = memoryview(self.map)[position:]
+            self.views.append(self.term_bytes)
+        except Exception:
+            self.close()
+            raise
+    
+    def _find_term(self, term):
+        """Binary search the sorted words; return the word's number or None."""
+        key = term.encode("utf-8")
+        low, high = 0, self.num_terms
+        while low < high:
+            middle = (low + high) // 2
+            start, end = self.term_offsets[middle], self.term_offsets[middle + 1]
+            if self.term_bytes[start:end].tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.num_terms:
+            start, end = self.term_offsets[low], self.term_offsets[low + 1]
+            if self.term_bytes[start:end].tobytes() == key:
+                return low
+        return None
+    
+    def _postings(self, term):
+        number = self._find_term(term)
+        if number is None:
+            return ((), ())
+        start, end = self.posting_offsets[number], self.posting_offsets[number + 1]
+        return self.doc_ids[start:end], self.counts[start:end]
+    
+    def _doc_length(self, doc_id):
+        return self.doc_lengths[doc_id]
+    
+    def close(self):
+        for view in reversed(self.views):
+            view.release()
+        self.map.close()
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SearchableLibrary(Library):
+    """A Library with keyword search over titles and authors."""
+    
+    def __init__(self, name):
+        super().__init__(name)
+        self.search_index = BookSearchIndex()
+    
+    def _index_book(self, book):
+        super()._index_book(book)
+        self.search_index.add(len(self.books) - 1, f"{book.title} {book.author}")
+    
+    def search(self, query, mode="and", limit=10):
+        """Return up to `limit` (book, score) pairs, best first."""
+        return [(self.books[doc_id], score)
+                for doc_id, score in self.search_index.search(query, mode, limit)]
+
+catalog = SearchableLibrary("Search Library")
+catalog.add_book(Book("Python Basics", "John Doe", "123456"))
+catalog.add_book(Book("Advanced Python", "Jane Smith", "789012"))
+catalog.add_book(Book("Cooking Basics", "John Smith", "345678"))
+
+for query, mode in (("python basics", "and"), ("python basics", "or"), ("smith", "and")):
+    found = [f"{book.title} ({score:.2f})" for book, score in catalog.search(query, mode)]
+    print(f"{mode.upper()} search for '{query}': {found}")
+
+# Benchmark: build, save and reopen an index of many books
+def benchmark_search_index(num_books=50_000, filename="books.idx"):
+    rng = random.Random(3)
+    words = ["python", "data", "guide", "history", "modern", "cooking", "art",
+             "science", "world", "secret", "garden", "night", "river", "code"]
+    big_catalog = SearchableLibrary("Big Library")
+    start = time.perf_counter()
+    big_catalog.add_books(
+        Book(" ".join(rng.sample(words, 3)).title(), f"Author {i % 5000}", f"ISBN{i}")
+        for i in range(num_books))
+    build_seconds = time.perf_counter() - start
+    big_catalog.search_index.save(filename)
+    
+    start = time.perf_counter()
+    mapped = MappedBookSearchIndex(filename)
+    load_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(100):
+        results = mapped.search("python garden", limit=10)
+    query_seconds = (time.perf_counter() - start) / 100
+    same = results == big_catalog.search_index.search("python garden", limit=10)
+    mapped.close()
+    size = os.path.getsize(filename)
+    os.remove(filename)
+    return build_seconds, size, load_seconds, query_seconds, same
+
+if __name__ == "__main__":
+    build_seconds, size, load_seconds, query_seconds, same = benchmark_search_index()
+    print(f"\n50,000 books: built in {build_seconds:.2f}s, index file {size / 1024:,.0f} KB")
+    print(f"Opened from disk in {load_seconds * 1000:.2f} ms; "
+          f"AND query {query_seconds * 1000:.2f} ms; same results as in memory: {same}")
+
@@ -293,6 +293,278 @@ class StringUtils:
         """Count words in a string."""
         return len(text.split())
 
+# --------------------------------------------
+# A primes module
+# --------------------------------------------
+# Trial division tries every number up to sqrt(n) on every call. Instead:
+#   - small numbers are looked up in a cached sieve of Eratosthenes
+#     (a bytearray with a 1 for every prime), built once and grown as needed
+#   - bigger numbers are first divided by a few small primes (this rules
+#     out most of them), then checked with the Miller-Rabin test. With the
+#     right bases it gives an exact answer for every n < 3.3 * 10**24
+#     (so every 64-bit number); smaller n need fewer bases.
+#   - primes_in_range(lo, hi) sieves one segment of the range at a time,
+#     so memory stays the same whether the range is small or huge
+# The segments only store odd numbers: index i means start + 2*i.
+import builtins
+import operator
+from bisect import bisect_right
+from itertools import compress
+from time import perf_counter
+
+# "from math import *" in section 1 replaced the built-in pow() with
+# math.pow(), which has no modulus argument, so we use the built-in one
+modular_pow = builtins.pow
+
+SMALL_PRIME_LIMIT = 1 << 20         # is_prime looks these up in the sieve
+SIEVE_SEGMENT_SIZE = 1 << 18        # Odd numbers per segment
+TRIAL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+# (limit, bases): these bases give exact answers for every n < limit
+MILLER_RABIN_BASES = (
+    (3_215_031_751, (2, 3, 5, 7)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (3_825_123_056_546_413_051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318_665_857_834_031_151_167_461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+    (3_317_044_064_679_887_385_961_981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+)
+
+_prime_flags = bytearray()          # _prime_flags[n] == 1 if n is prime
+_prime_list = []                    # The same primes as a sorted list
+
+def sieve_small_primes(limit):
+    """Make sure the cached sieve covers 0..limit."""
+    global _prime_flags, _prime_list
+    if limit < len(_prime_flags):
+        return
+    limit = max(limit, 2 * len(_prime_flags), 1 << 16)  # Grow in big steps
+    flags = bytearray([1]) * (limit + 1)
+    flags[0:2] = b"\x00\x00"
+    for p in range(2, math.isqrt(limit) + 1):
+        if flags[p]:
+            flags[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    _prime_flags = flags
+    _prime_list = list(compress(range(limit + 1), flags))
+
+def small_primes(limit):
+    """Return the list of primes <= limit (from the cache)."""
+    sieve_small_primes(limit)
+    return _prime_list[:bisect_right(_prime_list, limit)]
+
+def is_prime(n):
+    """Check if n is prime: table lookup for small n, Miller-Rabin otherwise."""
+    if isinstance(n, float):
+        if not n.is_integer():
+            return False    # 17.5 (or nan, or inf) is not a whole number
+        n = int(n)
+    else:
+        n = operator.index(n)   # Any other kind of integer; TypeError if not
+    if n < 2:
+        return False
+    if n < len(_prime_flags) or n <= SMALL_PRIME_LIMIT:
+        sieve_small_primes(n)
+        return _prime_flags[n] == 1
+    for p in TRIAL_PRIMES:
+        if n % p == 0:
+            return False
+    for limit, bases in MILLER_RABIN_BASES:
+        if n < limit:
+            break
+    # Past the last limit the answer is "prime" with tiny error chance
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in bases:
+        x = modular_pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False        # a proves that n is composite
+    return True
+
+def sieve_segment(start, size, base_primes):
+    """Flags for the odd numbers start, start + 2, ... (start must be odd)."""
+    flags = bytearray([1]) * size
+    end = start + 2 * size
+    for p in base_primes:
+        if p == 2:
+            continue
+        if p * p >= end:
+            break
+        # First odd multiple of p in the segment (and at least p*p)
+        first = max(p * p, (start + p - 1) // p * p)
+        if first % 2 == 0:
+            first += p
+        index = (first - start) // 2
+        if index < size:
+            flags[index::p] = bytes(len(range(index, size, p)))
+    return flags
+
+def prime_segments(lo, hi):
+    """Yield (start, flags) for odd numbers in [lo, hi), one segment at a time."""
+    start = max(lo, 3) | 1              # First odd number >= lo (and >= 3)
+    if start >= hi:
+        return
+    base_primes = small_primes(math.isqrt(hi - 1))
+    while start < hi:
+        size = min(SIEVE_SEGMENT_SIZE, (hi - start + 1) // 2)
+        yield start, sieve_segment(start, size, base_primes)
+        start += 2 * size
+
+def primes_in_range(lo, hi):
+    """Yield the primes p with lo <= p < hi, in order."""
+    if lo <= 2 < hi:
+        yield 2
+    for start, flags in prime_segments(lo, hi):
+        yield from compress(range(start, start + 2 * len(flags), 2), flags)
+
+# Counting primes with every core
+# prime_count splits [lo, hi) into tasks and a multiprocessing Pool sieves
+# them at the same time. Each worker sends back just one number (how many
+# primes it found), never the sieve itself, so almost nothing is copied
+# between processes.
+#
+# make_process_pool is a copy of the helper in 08_practical_projects.py
+# (these scripts don't import each other); the comment there explains the
+# "fork" and "spawn" start methods. With spawn (the default on Windows and
+# macOS) every worker imports this file again and runs its top-level code,
+# so the benchmarks and the pool demo all stay under
+# `if __name__ == "__main__":`.
+import multiprocessing
+
+PRIME_COUNT_TASK_SIZE = 1 << 24     # Numbers per task (about 16 million)
+
+def make_process_pool(workers=None):
+    """Create a multiprocessing Pool, using the "fork" start method on Linux."""
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork").Pool(workers)
+    return multiprocessing.Pool(workers)
+
+def count_primes_in_segment(bounds):
+    """Worker: count the primes in [lo, hi). Must live at the top level."""
+    lo, hi = bounds
+    count = 1 if lo <= 2 < hi else 0
+    for _, flags in prime_segments(lo, hi):
+        count += flags.count(1)
+    return count
+
+def prime_count(lo, hi, workers=None):
+    """Count the primes p with lo <= p < hi using `workers` processes."""
+    workers = workers or os.cpu_count() or 1
+    tasks = [(start, min(start + PRIME_COUNT_TASK_SIZE, hi))
+             for start in range(lo, hi, PRIME_COUNT_TASK_SIZE)]
+    if workers == 1 or len(tasks) <= 1:
+        return sum(map(count_primes_in_segment, tasks))
+    # Sieve the base primes once here; forked workers get a copy for free
+    sieve_small_primes(math.isqrt(hi - 1))
+    with make_process_pool(workers) as pool:
+        return sum(pool.imap_unordered(count_primes_in_segment, tasks))
+
+# --------------------------------------------
+# A factorial module
+# --------------------------------------------
+# n * (n - 1) * ... one step at a time multiplies a huge number by a tiny
+# one n times. Python multiplies two big numbers of similar size much
+# faster, so "binary splitting" multiplies the two halves of the range
+# separately and then multiplies the results:
+#     1*2*...*8 = ((1*2) * (3*4)) * ((5*6) * (7*8))
+# The recursion is only log2(n) levels deep, so no stack overflow.
+#
+# The "prime swing" method (Peter Luschny) goes further:
+#     n! = (n // 2)! ** 2 * swing(n)
+# where swing(n) = n! / (n // 2)! ** 2 is built from prime powers, taken
+# from primes_in_range above: p appears once for every k where n // p**k
+# is odd.
+#
+# Results for n <= FACTORIAL_CHECKPOINT_LIMIT are built from checkpoints
+# (0!, 1000!, 2000!, ...) that are kept, so the next call only multiplies
+# the numbers after the nearest checkpoint. lru_cache keeps the last few
+# answers for repeated calls with the same n.
+# (Our names don't clash with math.factorial, which "from math import *"
+# brought in above.)
+import functools
+
+FACTORIAL_CHECKPOINT_STEP = 1000
+FACTORIAL_CHECKPOINT_LIMIT = 50_000
+_factorial_checkpoints = [1]        # _factorial_checkpoints[i] == (i * STEP)!
+
+def product_range(lo, hi):
+    """Multiply lo * (lo + 1) * ... * (hi - 1) by binary splitting."""
+    if hi - lo <= 16:
+        result = 1
+        for number in range(lo, hi):
+            result *= number
+        return result
+    middle = (lo + hi) // 2
+    return product_range(lo, middle) * product_range(middle, hi)
+
+def product_list(numbers, lo=0, hi=None):
+    """Multiply numbers[lo:hi] by binary splitting."""
+    if hi is None:
+        hi = len(numbers)
+    if hi - lo <= 16:
+        result = 1
+        for number in numbers[lo:hi]:
+            result *= number
+        return result
+    middle = (lo + hi) // 2
+    return product_list(numbers, lo, middle) * product_list(numbers, middle, hi)
+
+def prime_swing(n):
+    """swing(n) = n! / (n // 2)! ** 2, as a product of prime powers."""
+    factors = []
+    for p in primes_in_range(2, n + 1):
+        power, q = 1, n
+        while q >= p:
+            q //= p
+            if q % 2 == 1:
+                power *= p
+        if power > 1:
+            factors.append(power)
+    return product_list(factors)
+
+def factorial_swing(n):
+    """n! using the prime swing method."""
+    if n < 64:
+        return product_range(2, n + 1)
+    return factorial_swing(n // 2) ** 2 * prime_swing(n)
+
+@functools.lru_cache(maxsize=16)
+def fast_factorial(n, method="split"):
+    """n! for n >= 0; method is "split" (binary splitting) or "swing"."""
+    if n < 0:
+        raise ValueError("factorial is not defined for negative numbers")
+    if n > FACTORIAL_CHECKPOINT_LIMIT:
+        if method == "swing":
+            return factorial_swing(n)
+        return product_range(2, n + 1)
+    # Add the missing checkpoints up to n, then finish from the last one
+    index = n // FACTORIAL_CHECKPOINT_STEP
+    while len(_factorial_checkpoints) <= index:
+        last = len(_factorial_checkpoints) - 1
+        lo = last * FACTORIAL_CHECKPOINT_STEP + 1
+        _factorial_checkpoints.append(
+            _factorial_checkpoints[last] * product_range(lo, lo + FACTORIAL_CHECKPOINT_STEP))
+    return _factorial_checkpoints[index] * product_range(index * FACTORIAL_CHECKPOINT_STEP + 1, n + 1)
+
+def log_factorial(n):
+    """Natural log of n!: exact from fast_factorial for cached n, else lgamma."""
+    if n <= FACTORIAL_CHECKPOINT_LIMIT:
+        return math.log(fast_factorial(n))
+    return math.lgamma(n + 1)
+
+def binomial(n, k):
+    """n choose k = n! / (k! * (n - k)!)."""
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    # n * (n - 1) * ... * (n - k + 1) / k!, both made by binary splitting
+    return product_range(n - k + 1, n + 1) // fast_factorial(k)
+
 class MathUtils:
     """Utility class for math operations."""
     
@@ -301,23 +573,121 @@ class MathUtils:
         """Calculate factorial."""
         if n <= 1:
             return 1
-        return n * MathUtils.factorial(n - 1)
+        return fast_factorial(n)
     
     @staticmethod
     def is_prime(n):
         """Check if number is prime."""
+        return is_prime(n)
+
+# Using the utility classes
+print(f"Reverse of 'Python': {StringUtils.reverse('Python')}")
+print(f"Is 'racecar' a palindrome? {StringUtils.is_palindrome('racecar')}")
+print(f"Factorial of 5: {MathUtils.factorial(5)}")
+print(f"Factorial of 1000 has {len(str(MathUtils.factorial(1000)))} digits")
+print(f"10 choose 3: {binomial(10, 3)}, log(100!): {log_factorial(100):.4f}")
+print(f"Is 17 prime? {MathUtils.is_prime(17)}")
+print(f"Is 2**61 - 1 prime? {MathUtils.is_prime(2 ** 61 - 1)}")
+print(f"Primes between 100 and 150: {list(primes_in_range(100, 150))}")
+
+# Benchmark against trial division
+def benchmark_primes(limit=200_000, big_numbers=100):
+    def is_prime_trial_division(n):
         if n < 2:
             return False
         for i in range(2, int(n ** 0.5) + 1):
             if n % i == 0:
                 return False
         return True
+    
+    results = []
+    start = perf_counter()
+    slow = [n for n in range(limit) if is_prime_trial_division(n)]
+    results.append((f"primes below {limit:,}: trial division", perf_counter() - start))
+    start = perf_counter()
+    fast = [n for n in range(limit) if MathUtils.is_prime(n)]
+    results.append((f"primes below {limit:,}: MathUtils.is_prime", perf_counter() - start))
+    start = perf_counter()
+    streamed = list(primes_in_range(0, limit))
+    results.append((f"primes below {limit:,}: primes_in_range", perf_counter() - start))
+    
+    rng = random.Random(1)
+    numbers = [rng.randrange(10 ** 11, 10 ** 12) | 1 for _ in range(big_numbers)]
+    start = perf_counter()
+    slow_big = [is_prime_trial_division(n) for n in numbers]
+    results.append((f"{big_numbers} numbers near 10**12: trial division", perf_counter() - start))
+    start = perf_counter()
+    fast_big = [MathUtils.is_prime(n) for n in numbers]
+    results.append((f"{big_numbers} numbers near 10**12: MathUtils.is_prime", perf_counter() - start))
+    return results, slow == fast == streamed and slow_big == fast_big
 
-# Using the utility classes
-print(f"Reverse of 'Python': {StringUtils.reverse('Python')}")
-print(f"Is 'racecar' a palindrome? {StringUtils.is_palindrome('racecar')}")
-print(f"Factorial of 5: {MathUtils.factorial(5)}")
-print(f"Is 17 prime? {MathUtils.is_prime(17)}")
+if __name__ == "__main__":
+    results, same = benchmark_primes()
+    print()
+    for name, seconds in results:
+        print(f"  {name:<45} {seconds:.3f}s")
+    print(f"  Same answers: {same}")
+
+# Scaling benchmark: the same count with 1, 2, 4 and 8 worker processes.
+# Raise hi to 10**10 for a long run (pi(10**10) = 455,052,511).
+def benchmark_prime_count(hi=10 ** 8, worker_counts=(1, 2, 4, 8)):
+    results = []
+    for workers in worker_counts:
+        start = perf_counter()
+        count = prime_count(0, hi, workers)
+        results.append((workers, count, perf_counter() - start))
+    return results
+
+# Factorial benchmark. The old version (one multiplication per number) is
+# only timed up to 20,000; use max_n=10 ** 6 for the full run (it takes
+# a while even for math.factorial, written in C).
+def benchmark_factorial(max_n=10 ** 5, max_loop_n=20_000):
+    def factorial_loop(n):
+        result = 1
+        for number in range(2, n + 1):
+            result *= number
+        return result
+    
+    results = []
+    n = 1000
+    while n <= max_n:
+        timings = {}
+        expected = math.factorial(n)
+        functions = [("math.factorial", math.factorial),
+                     ("split", lambda n: product_range(2, n + 1)),
+                     ("swing", factorial_swing)]
+        if n <= max_loop_n:
+            functions.insert(0, ("one by one", factorial_loop))
+        for name, function in functions:
+            start = perf_counter()
+            correct = function(n) == expected
+            timings[name] = (perf_counter() - start, correct)
+        results.append((n, timings))
+        n *= 10
+    
+    # Checkpoints: many calls with nearby n
+    start = perf_counter()
+    for n in range(40_000, 40_100):
+        fast_factorial(n)
+    checkpoint_seconds = perf_counter() - start
+    return results, checkpoint_seconds
+
+if __name__ == "__main__":
+    results, checkpoint_seconds = benchmark_factorial()
+    print()
+    for n, timings in results:
+        line = ", ".join(f"{name} {seconds:.4f}s" + ("" if correct else " WRONG")
+                         for name, (seconds, correct) in timings.items())
+        print(f"  {n:>9,}!: {line}")
+    print(f"  100 factorials near 40,000 with checkpoints: {checkpoint_seconds:.3f}s")
+
+if __name__ == "__main__":
+    print(f"\nPrimes below 1,000,000: {prime_count(0, 10 ** 6)}")
+    print("Counting the primes below 10**8:")
+    timings = benchmark_prime_count()
+    for workers, count, seconds in timings:
+        print(f"  {workers} worker(s): {count:,} primes in {seconds:.2f}s "
+              f"({timings[0][2] / seconds:.1f}x)")
 
 print("\n=== Modules and Packages Complete ===")
 